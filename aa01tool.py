@@ -15,6 +15,7 @@ Author: Willem Hengeveld <itsme@xs4all.nl>
 """
 class Info:
     """ This mostly contains info on position and size of the other sections in the file """
+    __slots__ = ('idx', 'idz', 'siz', 'typ', 'yop', 'lbl')
     def __init__(self):
         self.idx = None
         self.idz = None
@@ -28,6 +29,7 @@ class Info:
 
 class Meta:
     """ contains metadata for the files, liek uid, gid, filemode, timestamps """
+    __slots__ = ('pat', 'typ', 'uid', 'gid', 'mod', 'flg', 'mtm', 'ctm')
     def __init__(self):
         self.pat = None
         self.typ = None
@@ -43,6 +45,7 @@ class Meta:
 
 class Data:
     """ This contins info on the file-type, size, and data """
+    __slots__ = ('pat', 'typ', 'flg', 'dat', 'dataofs', 'fh')
     def __init__(self):
         self.pat = None
         self.typ = None
@@ -61,98 +64,152 @@ class Data:
 
 class Top:
     """ The top-level contains sections of info, meta and data types """
+    __slots__ = ('typ', 'yop', 'lbl', 'dat', 'dataofs', 'fh')
     def __init__(self):
         self.typ = None
         self.yop = None
         self.lbl = None
         self.dat = None
+        self.dataofs = None
+        self.fh = None
     def __repr__(self):
         return f"t:{self.typ} y:{self.yop} lbl:{self.lbl} dat={self.dat or 0:08x}"
 
 
-def decoder(fh, cls):
+# the 'AA01' magic, followed by the total record size.
+RECORD_HDR = struct.Struct("<4sH")
+
+U8 = struct.Struct("<B").unpack_from
+U16 = struct.Struct("<H").unpack_from
+U32 = struct.Struct("<L").unpack_from
+U64 = struct.Struct("<Q").unpack_from
+
+"""
+there are four ways of encoding the size of the value:
+ - time: S/T
+ - size: A/B
+ - name: P
+ - rest: 1/2/4/8
+
+This maps the valuetype to the encoded size and the unpack function.
+The 'T' time is 8 bytes followed by 4 unused bytes.
+'P' names are variable sized, with a 16 bit length prefix.
+"""
+VALUE_TYPES = {
+    ord('1'): (1, U8),
+    ord('2'): (2, U16),
+    ord('4'): (4, U32),
+    ord('8'): (8, U64),
+    ord('A'): (2, U16),
+    ord('B'): (4, U32),
+    ord('P'): (None, None),
+    ord('T'): (12, U64),
+    ord('S'): (8, U64),
+}
+
+# the known field names, see the NeoAAFieldType document.
+KNOWN_FIELDS = (
+    b'TYP', b'PAT', b'LNK', b'DEV', b'DAT', b'UID', b'GID', b'MOD', b'FLG',
+    b'MTM', b'BTM', b'CTM', b'HLC', b'CLC', b'SLC', b'CKS', b'SH1', b'SH2',
+    b'SH3', b'SH5', b'XAT', b'ACL', b'SIZ', b'IDX', b'IDZ', b'YOP', b'LBL',
+    b'XID', b'INO', b'AFT', b'AFR', b'FLI',
+)
+
+# maps the raw 4 byte tag to the attribute name, value size and unpack function.
+TAG_TABLE = {
+    name + bytes([spec]): (name.decode().lower(), *valuetype)
+    for name in KNOWN_FIELDS
+    for spec, valuetype in VALUE_TYPES.items()
+}
+
+def decodetag(tag):
+    """ decode a tag which is not in the TAG_TABLE """
+    if len(tag) != 4:
+        raise EOFError()
+    valuetype = VALUE_TYPES.get(tag[3])
+    if valuetype is None:
+        raise Exception("invalid valuetype")
+    return tag[:3].decode().lower(), *valuetype
+
+def decoder(fh, cls, size=None):
     """
     Both top level and sub sections have the same kind of format.
     This function can decode all of them
+
+    Properties which `cls` has no slot for are skipped without decoding.
+    When `size` is known, decoding stops after that many bytes, otherwise at EOF.
     """
+    # the slot descriptors, for storing values without going through setattr.
+    setters = { name: cls.__dict__[name].__set__ for name in cls.__slots__ }
     o = fh.tell()
-    while not fh.eof():
+    end = o + size if size is not None else None
+    while end is None or o < end:
+        # the consumer may have moved the file position since the previous record.
         fh.seek(o)
         try:
-            m0 = fh.read(4)
+            hdr = fh.read(RECORD_HDR.size)
         except EOFError:
             break
 
+        m0, sz = RECORD_HDR.unpack(hdr)
         if m0 != b'AA01':
             raise Exception('invalid AA01')
-        sz = fh.read16le()
-        data = fh.read(sz-6)
+        data = fh.read(sz-RECORD_HDR.size)
+        o += sz
 
         ent = cls()
 
-        rd = datareader.new(data)
-
-        """
-        there are four ways of encoding the size of the value:
-         - time: S/T
-         - size: A/B
-         - name: P
-         - rest: 1/2/4/8
-        """
-        def readvalue(spec):
-            match spec:
-                case '1': return rd.readbyte()
-                case '2': return rd.read16le()
-                case '4': return rd.read32le()
-                case '8': return rd.read64le()
-                case 'A': return rd.read16le()
-                case 'B': return rd.read32le()
-                case 'P':
-                    sz = rd.read16le()
-                    return rd.readstr(sz)
-                case 'T':
-                    t = rd.read64le()
-                    rd.skip(4)
-                    return t
-                case 'S': return rd.read64le()
-            raise Exception("invalid valuetype")
-
         # read properties
-        while not rd.eof():
-            tag = rd.readstr(4)
-            value = readvalue(tag[3])
-            setattr(ent, tag[:3].lower(), value)
-        o = fh.tell()
-        if hasattr(ent, "dat") and ent.dat:
-            ent.dataofs = o
-            ent.fh = fh
-            o += ent.dat
+        mv = memoryview(data)
+        pos = 0
+        datsize = 0
+        datend = len(data)
+        while pos < datend:
+            tag = data[pos:pos+4]
+            attr, width, unpack = TAG_TABLE.get(tag) or decodetag(tag)
+            pos += 4
+            if width is None:
+                width, = U16(mv, pos)
+                pos += 2
+            setter = setters.get(attr)
+            if setter is None and attr != 'dat':
+                # not needed for this record type
+                pos += width
+                continue
+            if unpack:
+                value, = unpack(mv, pos)
+            else:
+                value = data[pos:pos+width].rstrip(b"\x00").decode()
+            pos += width
+            if attr == 'dat':
+                datsize = value
+            if setter:
+                setter(ent, value)
+        if datsize:
+            if 'dataofs' in setters:
+                ent.dataofs = o
+                ent.fh = fh
+            o += datsize
         yield ent
         
 
+# maps the top-level 'yop' value to the class used for the section contents.
+SECTION_CLASSES = {
+    ord('M'): Info,
+    ord('E'): Data,
+    ord('O'): Meta,
+}
+
 def extract_aa01(fh):
     """ decode all sections from the aa01 file, yielding each item """
     for ent in decoder(fh, Top):
-        if ent.yop == ord('M'):
-            yield from decoder(fh.subreader(ent.dat), Info)
-        elif ent.yop == ord('E'):
-            yield from decoder(fh.subreader(ent.dat), Data)
-        elif ent.yop == ord('O'):
-            yield from decoder(fh.subreader(ent.dat), Meta)
-        else:
+        cls = SECTION_CLASSES.get(ent.yop)
+        if cls is None:
             print("unknown section", ent.yop)
+        else:
+            yield from decoder(fh.subreader(ent.dat), cls, ent.dat)
 
 
-def copydata(ifh, ofh, size):
-    """ copy 'size' byte from input 'ifh' to output 'ofh' """
-    while size:
-        want = min(size, 0x100000)
-        data = ifh.read(want)
-        if not data:
-            break
-        ofh.write(data)
-        size -= want
-
 def list_contents(fh):
     for e in extract_aa01(fh):
         print(e)
@@ -166,7 +223,7 @@ def extract_files(fh, savedir):
                 os.makedirs(os.path.dirname(savename), exist_ok=True)
                 with open(savename, "wb") as ofh:
                     e.fh.seek(e.dataofs)
-                    copydata(e.fh, ofh, e.dat)
+                    datareader.copydata(e.fh, ofh, e.dat)
 
 
 def main():
@@ -1,6 +1,7 @@
 from abc import ABC, abstractmethod
 from typing import IO
 import struct
+import os
 
 """
 FileReader and DataReader provide an easy method of deconstructing binary data into more useful types.
@@ -135,12 +136,31 @@ class StreamRange:
         elif whence==BaseReader.SEEK_END:
             return self.fh.seek(self.end + ofs, whence) - self.start
 
+    def fileno(self):
+        return self.fh.fileno()
+
+    def filepos(self):
+        """ returns the absolute position in the underlying os-level file """
+        fh = self.fh
+        while isinstance(fh, StreamRange):
+            fh = fh.fh
+        return fh.tell()
+
     def read(self, n=-1):
         remaining = self.end - self.tell()
         if n==-1 or n>remaining:
             n = remaining
         return self.fh.read(n)
 
+    def remaining(self):
+        return self.end - self.tell()
+
+    def readinto(self, buf):
+        remaining = self.end - self.tell()
+        if len(buf) > remaining:
+            buf = memoryview(buf)[:remaining]
+        return self.fh.readinto(buf)
+
 
 class FileReader(BaseReader):
     def __init__(self, fh:IO):
@@ -165,6 +185,18 @@ class FileReader(BaseReader):
     def subreader(self, n=-1):
         return FileReader(StreamRange(self.fh, self.fh.tell(), n))
 
+    def fileno(self):
+        return self.fh.fileno()
+
+    def filepos(self):
+        """
+        Returns the absolute position in the underlying os-level file,
+        for use with functions like os.sendfile.
+        """
+        if isinstance(self.fh, StreamRange):
+            return self.fh.filepos()
+        return self.fh.tell()
+
     def read(self, n=-1):
         if self._eof:
             # already in EOF state.
@@ -182,6 +214,23 @@ class FileReader(BaseReader):
 
         return data
 
+    def remaining(self):
+        """
+        Returns the nr of bytes left in a subreader,
+        or None when reading directly from a file, where the size is not known.
+        Note: unlike DataReader.remaining, callers must handle None.
+        """
+        if isinstance(self.fh, StreamRange):
+            return self.fh.remaining()
+        return None
+
+    def readinto(self, buf) -> int:
+        """
+        Reads up to len(buf) bytes into `buf`, returns the nr of bytes read.
+        Like io.RawIOBase.readinto, this does not raise EOFError.
+        """
+        return self.fh.readinto(buf)
+
     def readbyte(self):
         return struct.unpack(">B", self.read(1))[0]
 
@@ -259,6 +308,72 @@ class DataReader(BaseReader):
         self.pos = i+1
         return self.data[p0:self.pos-1].decode(encoding)
 
+"""
+kernel side file copy functions, in order of preference.
+each is called as copy(infd, outfd, ofs, size), and returns the nr of bytes copied.
+"""
+def kernel_copy_file_range(infd, outfd, ofs, size):
+    return os.copy_file_range(infd, outfd, size, ofs)
+
+def kernel_sendfile(infd, outfd, ofs, size):
+    return os.sendfile(outfd, infd, ofs, size)
+
+def kernelcopy(ifh, ofh, size):
+    """
+    copy up to 'size' bytes from FileReader 'ifh' to 'ofh', without passing the data through python.
+    Stops at the end of a subreader range.
+
+    Returns the number of bytes which still need to be copied.
+    Afterwards 'ifh' is positioned directly after the copied data.
+    """
+    try:
+        infd, outfd = ifh.fileno(), ofh.fileno()
+        ofs = ifh.filepos()
+    except (AttributeError, OSError):
+        # not backed by a real file
+        return size
+
+    remaining = ifh.remaining()
+    want = size if remaining is None else min(size, remaining)
+
+    ofh.flush()
+    for copy in (kernel_copy_file_range, kernel_sendfile):
+        try:
+            while want:
+                n = copy(infd, outfd, ofs, want)
+                if not n:
+                    break
+                ofs += n
+                want -= n
+                size -= n
+            break
+        except (AttributeError, OSError):
+            # not available on this platform, or not supported for these files.
+            pass
+
+    # the kernel copy functions do not move the file position.
+    ifh.seek(ofs - ifh.filepos(), ifh.SEEK_CUR)
+    return size
+
+# reused by copydata, to avoid allocating a new chunk for each read.
+COPYBUF = memoryview(bytearray(0x100000))
+
+def copydata(ifh, ofh, size):
+    """
+    copy 'size' bytes from the current position of FileReader 'ifh' to 'ofh'.
+    Uses os.copy_file_range or os.sendfile when possible,
+    otherwise reads via a reusable buffer.
+
+    Raises EOFError when 'ifh' ends early.
+    """
+    size = kernelcopy(ifh, ofh, size)
+    while size:
+        n = ifh.readinto(COPYBUF[:min(size, len(COPYBUF))])
+        if not n:
+            raise EOFError()
+        ofh.write(COPYBUF[:n])
+        size -= n
+
 import unittest
 class TestReader(unittest.TestCase):
     def testRd(self):
@@ -279,6 +394,106 @@ class TestReader(unittest.TestCase):
         self.assertEqual(r.read(4), b"\x00\x01\x02\x03")
         self.assertEqual(r.read(), bytes(range(4, 16)))
 
+    def testReadInto(self):
+        from io import BytesIO
+        r = FileReader(BytesIO(bytes(range(16))))
+        buf = bytearray(4)
+        self.assertEqual(r.readinto(buf), 4)
+        self.assertEqual(buf, b"\x00\x01\x02\x03")
+        r.seek(14)
+        self.assertEqual(r.readinto(buf), 2)
+        self.assertEqual(buf[:2], b"\x0e\x0f")
+        self.assertEqual(r.readinto(buf), 0)
+
+        r.seek(2)
+        sub = r.subreader(3)
+        self.assertEqual(sub.readinto(buf), 3)
+        self.assertEqual(buf[:3], b"\x02\x03\x04")
+
+    def testCopyData(self):
+        import tempfile
+        with tempfile.TemporaryFile() as ifile, tempfile.TemporaryFile() as ofile:
+            ifile.write(bytes(range(256)))
+            r = FileReader(ifile)
+            r.seek(16)
+            sub = r.subreader(64)
+            sub.seek(8)
+            copydata(sub, ofile, 32)
+            # kernel copies don't move the file position, copydata must.
+            self.assertEqual(sub.tell(), 40)
+            self.assertEqual(r.tell(), 56)
+            ofile.seek(0)
+            self.assertEqual(ofile.read(), bytes(range(24, 56)))
+
+    def testCopyDataFallback(self):
+        from io import BytesIO
+        r = FileReader(BytesIO(bytes(range(256))))
+        r.seek(16)
+        sub = r.subreader(64)
+        sub.seek(8)
+        ofile = BytesIO()
+        copydata(sub, ofile, 32)
+        self.assertEqual(sub.tell(), 40)
+        self.assertEqual(ofile.getvalue(), bytes(range(24, 56)))
+
+    def testCopyDataTruncated(self):
+        import tempfile
+        from io import BytesIO
+        with tempfile.TemporaryFile() as ifile, tempfile.TemporaryFile() as ofile:
+            ifile.write(bytes(range(256)))
+            r = FileReader(ifile)
+            r.seek(240)
+            with self.assertRaises(EOFError):
+                copydata(r, ofile, 32)
+            ofile.seek(0)
+            self.assertEqual(ofile.read(), bytes(range(240, 256)))
+
+            # the copy must not run past the end of a subreader.
+            r.seek(16)
+            sub = r.subreader(64)
+            sub.seek(48)
+            ofile.seek(0)
+            ofile.truncate()
+            with self.assertRaises(EOFError):
+                copydata(sub, ofile, 32)
+            ofile.seek(0)
+            self.assertEqual(ofile.read(), bytes(range(64, 80)))
+
+        r = FileReader(BytesIO(bytes(range(16))))
+        with self.assertRaises(EOFError):
+            copydata(r, BytesIO(), 32)
+
+    def testCopyDataPartialKernelCopy(self):
+        import sys
+        import tempfile
+        from unittest import mock
+
+        calls = []
+        def prefixcopy(infd, outfd, ofs, size):
+            # copies only 5 bytes, then fails as if not supported.
+            if calls:
+                raise OSError()
+            calls.append(size)
+            return os.copy_file_range(infd, outfd, 5, ofs)
+        def nosendfile(infd, outfd, ofs, size):
+            raise OSError()
+
+        module = sys.modules[__name__]
+        with tempfile.TemporaryFile() as ifile, tempfile.TemporaryFile() as ofile, \
+                mock.patch.object(module, "kernel_copy_file_range", prefixcopy), \
+                mock.patch.object(module, "kernel_sendfile", nosendfile):
+            if not hasattr(os, "copy_file_range"):
+                self.skipTest("os.copy_file_range not available")
+            ifile.write(bytes(range(256)))
+            r = FileReader(ifile)
+            r.seek(16)
+            sub = r.subreader(64)
+            copydata(sub, ofile, 32)
+            self.assertEqual(calls, [32])
+            self.assertEqual(sub.tell(), 32)
+            ofile.seek(0)
+            self.assertEqual(ofile.read(), bytes(range(16, 48)))
+
     def testSeekTell(self):
         from io import BytesIO
         self.checkSeekTell(DataReader(bytes(range(256))))
@@ -17,68 +17,77 @@ cdpd, cdpu, rkos, l1cs - 'fwsg' arm64 binaries
 """
 from dataclasses import dataclass
 import struct
-import os.path
+import mmap
+import os
+import datareader
+
+FTAB_HDR = struct.Struct("<8L8s2L")
+FTAB_ENT = struct.Struct("<4s3L")
+
+@dataclass(slots=True)
+class Ent:
+    tag: str
+    ofs: int
+    size: int
+    zero: int
 
 def loadftab(fh):
     """
     read the ftab header
     """
-    hdrdata = fh.read(48)
-    hdrfields = struct.unpack("<8L", hdrdata[:32])
-    magic = hdrdata[32:40].decode()
-    nrentries, zero = struct.unpack("<2L", hdrdata[40:])
-    if magic != 'rkosftab':
+    hdrdata = fh.read(FTAB_HDR.size)
+    *hdrfields, magic, nrentries, zero = FTAB_HDR.unpack(hdrdata)
+    if magic != b'rkosftab':
         raise Exception("invalid magic")
 
-    @dataclass
-    class Ent:
-        tag: str
-        ofs: int
-        size: int
-        zero: int
-
     entries = []
 
-    for _ in range(nrentries):
-        entdata = fh.read(16)
-        tag, ofs, size, zero = struct.unpack("<4s3L", entdata)
+    tbl = fh.read(nrentries*FTAB_ENT.size)
+    if len(tbl) < nrentries*FTAB_ENT.size:
+        raise Exception("error reading data")
+    tbl = memoryview(tbl)
+    for i in range(nrentries):
+        tag, ofs, size, zero = FTAB_ENT.unpack_from(tbl, i*FTAB_ENT.size)
 
         entries.append(Ent(tag.decode(), ofs, size, zero))
 
     return entries
 
-def dump_ftab_list(ents, fh):
+def dump_ftab_list(ents, mm):
     """
     prints the entries from the ftab list, each with the first and last 32 bytes of the sections.
+
+    `mm` is a memory mapped view of the ftab file.
     """
-    prevend = 0
-    for e in ents:
-        if prevend and e.ofs-prevend>=4:
+    # maps entry index to the start of the gap preceding it.
+    gaps = {}
+    for i in range(1, len(ents)):
+        prevend = ents[i-1].ofs+ents[i-1].size
+        if ents[i].ofs-prevend>=4:
+            gaps[i] = prevend
+
+    for i, e in enumerate(ents):
+        if (prevend := gaps.get(i)) is not None:
             print(f"gap: {prevend:08x}-{e.ofs:08x}({e.ofs-prevend:x})")
 
-        fh.seek(e.ofs)
-        headdata = fh.read(min(e.size, 32))
+        headdata = mm[e.ofs:e.ofs+min(e.size, 32)]
         taildata = b""
         if e.size>32:
             ofs2 = max(e.ofs+e.size-32, e.ofs+32)
-            fh.seek(ofs2)
-            taildata = fh.read(e.ofs+e.size-ofs2)
+            taildata = mm[ofs2:e.ofs+e.size]
         print(f"{e.tag:4} {e.ofs:08x}-{e.ofs+e.size:08x}({e.size:08x}) {e.zero:08x} {headdata.hex()} .. {taildata.hex()}")
-        prevend = e.ofs+e.size
 
 def extract_ftab_entries(ents, fh, savedir):
     """
     splits ftab file in separate files.
     """
     for e in ents:
-        fh.seek(e.ofs)
         with open(os.path.join(savedir, f"{e.tag}.bin"), "wb") as ofh:
-            remaining = e.size
-            while remaining:
-                want = min(remaining, 0x100000)
-                data = fh.read(want)
-                ofh.write(data)
-                remaining -= want
+            fh.seek(e.ofs)
+            try:
+                datareader.copydata(datareader.new(fh), ofh, e.size)
+            except EOFError:
+                print(f"{e.tag}: truncated, wrote {ofh.tell():x} of {e.size:x} bytes")
 
 
 def main():
@@ -95,7 +104,8 @@ def main():
             if args.savedir:
                 extract_ftab_entries(ents, fh, args.savedir)
             else:
-                dump_ftab_list(ents, fh)
+                with mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    dump_ftab_list(ents, mm)
 
 if __name__=='__main__':
     main()
@@ -26,6 +26,24 @@ except ModuleNotFoundError:
 import struct
 import io
 
+FWSG_TRAILER = struct.Struct("<4s3L")
+FWSG_SEG = struct.Struct("<Q4L8s")
+
+# used for padding segments to a multiple of 4 or 8 bytes.
+ZEROS = b"\x00" * 8
+
+@dataclass(slots=True)
+class Ent:
+    vaddr: int
+    fileofs: int
+    filesize: int
+    memsize: int
+    flag: int
+    name: str
+
+    def __repr__(self):
+        return f"v:{self.vaddr:08x}-{self.vaddr+self.memsize:08x}({self.memsize:08x}) f:{self.fileofs:08x}-{self.fileofs+self.filesize:08x}({self.filesize:08x})  {self.flag:x} {self.name}"
+
 def read_fwsg_format(fh):
     """
     The fwsg header is at the end of the file,
@@ -40,34 +58,28 @@ def read_fwsg_format(fh):
 
     I don't have a way of determining if a segment is 16/32 or 64 bits.
     """
-    fh.seek(-32, io.SEEK_END)
-    data = fh.read(16)
-    if not data:
-        raise Exception("error reading data")
-    magic, flag, tableofs, nrentries = struct.unpack("<4s3L", data)
-    if magic != b"fwsg":
-        raise Exception("invalid magic")
+    if hasattr(fh, "fwsg_trailer"):
+        # already decoded by accept_file
+        tableofs, nrentries = fh.fwsg_trailer
+    else:
+        fh.seek(-32, io.SEEK_END)
+        data = fh.read(FWSG_TRAILER.size)
+        if not data:
+            raise Exception("error reading data")
+        magic, flag, tableofs, nrentries = FWSG_TRAILER.unpack(data)
+        if magic != b"fwsg":
+            raise Exception("invalid magic")
     fh.seek(tableofs)
 
-    @dataclass
-    class Ent:
-        vaddr: int
-        fileofs: int
-        filesize: int
-        memsize: int
-        flag: int
-        name: str
-
-        def __repr__(self):
-            return f"v:{self.vaddr:08x}-{self.vaddr+self.memsize:08x}({self.memsize:08x}) f:{self.fileofs:08x}-{self.fileofs+self.filesize:08x}({self.filesize:08x})  {self.flag:x} {self.name}"
+    tbl = fh.read(nrentries*FWSG_SEG.size)
+    if len(tbl) < nrentries*FWSG_SEG.size:
+        raise Exception("error reading data")
+    tbl = memoryview(tbl)
 
     seglist = []
-    for _ in range(nrentries):
-        entdata = fh.read(32)
-        if not entdata:
-            raise Exception("error reading data")
-        vaddr, fileofs, filesize, memsize, flag, name = struct.unpack("<Q4L8s", entdata)
-        seglist.append(Ent(vaddr, fileofs, filesize, memsize, flag, name.rstrip(b"\x00").decode()))
+    for i in range(nrentries):
+        vaddr, fileofs, filesize, memsize, flag, name = FWSG_SEG.unpack_from(tbl, i*FWSG_SEG.size)
+        seglist.append(Ent(vaddr, fileofs, filesize, memsize, flag, name.partition(b"\x00")[0].decode("ascii")))
     return seglist
 
 def dump_segment_list(seglist):
@@ -76,14 +88,16 @@ def dump_segment_list(seglist):
 
 def accept_file(fh, filename):
     fh.seek(-32, io.SEEK_END)
-    data = fh.read(16)
+    data = fh.read(FWSG_TRAILER.size)
     if not data:
         print("fwsg: no data")
         return 0
-    magic, flag, tableofs, nrentries = struct.unpack("<4s3L", data)
+    magic, flag, tableofs, nrentries = FWSG_TRAILER.unpack(data)
     if magic != b"fwsg":
         print("fwsg: bad magic")
         return 0
+    # keep the table location for read_fwsg_format.
+    setattr(fh, "fwsg_trailer", (tableofs, nrentries))
 
     # use attribute on the filehandle to keep track of how often we were called.
     if hasattr(fh, "fwsg32"):
@@ -99,17 +113,24 @@ def load_file(fh, neflags, fmt):
     paddingsize = 8 if use64 else 4
     idaapi.inf_set_app_bitness(64 if use64 else 32)
     seglist = read_fwsg_format(fh)
+
+    # local names for the functions used in the segment loop
+    add_segm = idaapi.add_segm
+    getseg = idaapi.getseg
+    put_bytes = idaapi.put_bytes
+    file2base = fh.file2base
+    bitness = 2 if use64 else 1
+
     for e in seglist:
-        idaapi.add_segm(0, e.vaddr, e.vaddr+e.memsize, e.name, "CODE")
-        seg = idaapi.getseg(e.vaddr)
-        seg.bitness = 2 if use64 else 1
+        add_segm(0, e.vaddr, e.vaddr+e.memsize, e.name, "CODE")
+        seg = getseg(e.vaddr)
+        seg.bitness = bitness
 
         fh.seek(e.fileofs)
-        fh.file2base(e.fileofs, e.vaddr, e.vaddr+e.filesize, 0)
+        file2base(e.fileofs, e.vaddr, e.vaddr+e.filesize, 0)
         if n := (e.vaddr+e.filesize)%paddingsize:
             # padding
-            for i in range(paddingsize-n):
-                idaapi.patch_byte(e.vaddr+e.filesize+i, 0)
+            put_bytes(e.vaddr+e.filesize, ZEROS[:paddingsize-n])
 
     return 1
 